@@ -13,7 +13,18 @@ print(f"Database URL: {DATABASE_URL}")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set. Please set it in your environment or .env file.")
 
-engine = create_async_engine(DATABASE_URL, echo=False, future=True)
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=False,
+    future=True,
+    pool_size=20,
+    max_overflow=40,
+    pool_timeout=30,
+    pool_recycle=3600,
+    pool_pre_ping=True,
+    # JIT only adds planning overhead for our short OLTP queries
+    connect_args={"server_settings": {"jit": "off", "application_name": "acme-api"}},
+)
 
 AsyncSessionLocal = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
@@ -1,24 +1,33 @@
 from fastapi import FastAPI, UploadFile, File, Depends, HTTPException, BackgroundTasks, Query
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlalchemy import select, delete, update
-from typing import List, Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel
 from .database import get_db, engine, Base
-from .models import Product, Webhook
+from .models import Product, Webhook, create_search_indexes
 import shutil
 import os
 import uuid
 import uvicorn
 import httpx
+import orjson
 from celery import Celery
 from pathlib import Path
-from .worker import delete_all_products_task
+from .worker import delete_all_products_task, invalidate_webhook_cache
 import asyncio
 
 
+# Where uploads are staged for the worker. Must be visible to both the API and the
+# worker; point it at a tmpfs mount shared by both (not a per-container /dev/shm)
+# to skip disk I/O.
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "./shared")
+UPLOAD_COPY_BUFFER = 1 << 20
+ALLOWED_UPLOAD_SUFFIXES = (".csv", ".csv.gz", ".csv.zst")
+
+
 app = FastAPI(Title="Acme Product Importer")
 
 # Mount static files for the UI
@@ -31,6 +40,8 @@ async def create_tables_background():
     except Exception as e:
         import logging
         logging.exception("Failed to initialize DB tables:", exc_info=e)
+        return
+    await create_search_indexes(engine)
 
 @app.on_event("startup")
 async def startup():
@@ -64,33 +75,34 @@ async def health_check():
 
 @app.get("/", response_class=HTMLResponse)
 async def root():
-    with open("./app/static/index.html", "r", encoding="utf-8") as f:
-        return f.read()
+    # FileResponse streams the file without blocking the event loop
+    return FileResponse("./app/static/index.html", media_type="text/html")
 
 # 1. CSV Upload Endpoint
 @app.post("/api/upload")
-async def upload_products(file: UploadFile = File(...)):
-    if not file.filename.endswith('.csv'):
+async def upload_products(
+    file: UploadFile = File(...),
+    mode: Literal["upsert", "append"] = Query("upsert", description="append skips SKUs that already exist"),
+):
+    # Compressed CSVs are saved as-is and decompressed by the worker
+    suffix = next((s for s in ALLOWED_UPLOAD_SUFFIXES if file.filename.endswith(s)), None)
+    if suffix is None:
         raise HTTPException(status_code=400, detail="Invalid file type")
 
-    # Ensure shared directory exists
-    shared_dir = Path("./shared")
-    shared_dir.mkdir(parents=True, exist_ok=True)
+    # Ensure upload directory exists
+    upload_dir = Path(UPLOAD_DIR)
+    upload_dir.mkdir(parents=True, exist_ok=True)
     
-    # Use a fixed filename that will be overwritten on each upload
-    file_path = shared_dir / "latest_upload.csv"
-
-    # Remove existing file if it exists
-    if file_path.exists():
-        file_path.unlink()
+    # Unique filename per upload; the worker removes it once imported
+    file_path = upload_dir / f"acme-upload-{uuid.uuid4()}{suffix}"
     
     # Save the uploaded file
     with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+        shutil.copyfileobj(file.file, buffer, UPLOAD_COPY_BUFFER)
 
     # Convert Path to string before passing to Celery task
     from worker import process_csv_upload
-    task = process_csv_upload.delay(str(file_path))
+    task = process_csv_upload.delay(str(file_path), mode)
 
     return {"task_id": task.id, "message": "Upload processing started"}
     #return {"message": "Upload Started"}
@@ -119,15 +131,30 @@ async def get_task_status(task_id: str):
     return response
 
 # 3. Product Management (CRUD)
-@app.get("/api/products", response_model=dict)
+MAX_PRODUCT_PAGE_SIZE = 100
+
+# Columns returned by the product list; selected as plain rows to skip ORM hydration
+PRODUCT_LIST_COLUMNS = (
+    Product.id,
+    Product.sku,
+    Product.name,
+    Product.description,
+    Product.is_active,
+    Product.created_at,
+    Product.updated_at,
+)
+
+@app.get("/api/products")
 async def list_products(
-    page: int = 1, 
-    limit: int = 20, 
+    after_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=MAX_PRODUCT_PAGE_SIZE),
     search: Optional[str] = None, 
     db: AsyncSession = Depends(get_db)
 ):
-    offset = (page - 1) * limit
-    query = select(Product).order_by(Product.id.desc()).offset(offset).limit(limit)
+    # Keyset pagination: seek past the last id of the previous page instead of OFFSET
+    query = select(*PRODUCT_LIST_COLUMNS).order_by(Product.id.desc()).limit(limit)
+    if after_id is not None:
+        query = query.where(Product.id < after_id)
     
     if search:
         # Simple filter by SKU or Name
@@ -138,20 +165,17 @@ async def list_products(
     
     try:
         result = await db.execute(query)
-        products = result.scalars().all()
+        rows = result.mappings().all()
+        products_data = [dict(row) for row in rows]
         
-        # Convert SQLAlchemy models to dictionaries
-        products_data = [{
-            "id": p.id,
-            "sku": p.sku,
-            "name": p.name,
-            "description": p.description,
-            "is_active": p.is_active,
-            "created_at": p.created_at.isoformat() if p.created_at else None,
-            "updated_at": p.updated_at.isoformat() if p.updated_at else None
-        } for p in products]
-        
-        return {"data": products_data, "page": page, "limit": limit}
+        # Only hand out a cursor when the page is full (there may be more rows)
+        next_cursor = rows[-1]["id"] if rows and len(rows) == limit else None
+
+        # orjson encodes datetimes natively; returning the response directly skips jsonable_encoder
+        return Response(
+            orjson.dumps({"data": products_data, "limit": limit, "next_cursor": next_cursor}),
+            media_type="application/json",
+        )
     except Exception as e:
         print(f"Error fetching products: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -160,7 +184,7 @@ async def list_products(
 async def create_product(product: ProductCreate, db: AsyncSession = Depends(get_db)):
     # Ensure SKU is unique/lower
     product.sku = product.sku.lower().strip()
-    new_prod = Product(**product.dict())
+    new_prod = Product(**product.model_dump())
     db.add(new_prod)
     try:
         await db.commit()
@@ -208,9 +232,10 @@ async def get_webhooks(db: AsyncSession = Depends(get_db)):
 
 @app.post("/api/webhooks")
 async def create_webhook(webhook: WebhookCreate, db: AsyncSession = Depends(get_db)):
-    new_hook = Webhook(**webhook.dict())
+    new_hook = Webhook(**webhook.model_dump())
     db.add(new_hook)
     await db.commit()
+    await invalidate_webhook_cache(new_hook.event_type)
     return new_hook
 
 @app.put("/api/webhooks/{id}")
@@ -225,19 +250,23 @@ async def update_webhook(
     if not hook:
         raise HTTPException(status_code=404, detail="Not found")
 
-    for key, value in webhook.dict().items():
+    old_event_type = hook.event_type
+    for key, value in webhook.model_dump().items():
         setattr(hook, key, value)
     await db.commit()
     await db.refresh(hook)
+    await invalidate_webhook_cache(old_event_type, hook.event_type)
     return hook
 
 @app.delete("/api/webhooks/{id}")
 async def delete_webhook(id: int, db: AsyncSession = Depends(get_db)):
-    query = delete(Webhook).where(Webhook.id == id)
+    query = delete(Webhook).where(Webhook.id == id).returning(Webhook.event_type)
     result = await db.execute(query)
-    if result.rowcount == 0:
+    event_type = result.scalar_one_or_none()
+    if event_type is None:
         raise HTTPException(status_code=404, detail="Not found")
     await db.commit()
+    await invalidate_webhook_cache(event_type)
     return {"message": "Deleted"}
 
 @app.patch("/api/webhooks/{id}/toggle")
@@ -250,6 +279,7 @@ async def toggle_webhook(id: int, db: AsyncSession = Depends(get_db)):
     hook.is_active = not hook.is_active
     await db.commit()
     await db.refresh(hook)
+    await invalidate_webhook_cache(hook.event_type)
     return hook
 
 @app.post("/api/webhooks/test")
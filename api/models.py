@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
+import logging
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, text
 from sqlalchemy.sql import func
 from .database import Base
 
@@ -19,4 +20,23 @@ class Webhook(Base):
     id = Column(Integer, primary_key=True, index=True)
     url = Column(String, nullable=False)
     event_type = Column(String, nullable=False) # e.g., 'product_created', 'import_completed'
-    is_active = Column(Boolean, default=True)
\ No newline at end of file
+    is_active = Column(Boolean, default=True)
+
+# Trigram GIN indexes let the leading-wildcard ILIKE search on sku/name use an index.
+# Kept out of create_all: they run in autocommit (CONCURRENTLY can't run in a
+# transaction and doesn't block writes), and a failure only costs search speed.
+SEARCH_INDEX_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_products_sku_trgm ON products USING gin (sku gin_trgm_ops)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_products_name_trgm ON products USING gin (name gin_trgm_ops)",
+]
+
+async def create_search_indexes(engine):
+    """Create the trigram search indexes if possible; failures are logged, not raised."""
+    try:
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            for statement in SEARCH_INDEX_DDL:
+                await conn.execute(text(statement))
+    except Exception as e:
+        logging.warning(f"Skipping trigram search indexes: {e}")
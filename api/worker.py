@@ -1,15 +1,25 @@
 import os
+import io
 import asyncio
-import pandas as pd
+import threading
+import time
+import csv
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.compute as pc
+from itertools import repeat
+import asyncpg
 from celery import Celery
-from .models import Product, Base, Webhook
+from celery.signals import worker_process_init
+from .models import Base, Webhook
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy import text, select
-from sqlalchemy.exc import DBAPIError, IntegrityError
 import logging
 import httpx
+import orjson
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
 from datetime import datetime
 
 # only load .env when running locally (not in container)
@@ -29,127 +39,350 @@ celery_app = Celery(
     backend=os.getenv("CELERY_RESULT_BACKEND")
 )
 
+# Redis cache for active webhook lookups (same Redis as the Celery broker)
+REDIS_URL = os.getenv("REDIS_URL") or os.getenv("CELERY_BROKER_URL")
+redis_client = aioredis.from_url(REDIS_URL) if REDIS_URL else None
+WEBHOOK_CACHE_TTL = 60
+
 # # Database setup for Worker (Needs its own engine instance)
 DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set. Please set it in your environment or .env file.")
-engine = create_async_engine(DATABASE_URL, echo=False)
+# Tasks upsert serially, so each worker process needs only a small pool
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=False,
+    pool_size=5,
+    max_overflow=5,
+    pool_timeout=30,
+    pool_recycle=3600,
+    pool_pre_ping=True,
+    connect_args={"server_settings": {"jit": "off", "application_name": "acme-worker"}},
+)
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
-async def process_chunk(session, chunk_data):
+# Event loop shared by every task in this worker process. Reusing one loop keeps
+# the engine's pooled asyncpg connections alive between tasks.
+worker_loop = None
+
+def get_worker_loop():
+    """Return this process's persistent event loop, creating it on first use."""
+    global worker_loop
+    if worker_loop is None or worker_loop.is_closed():
+        worker_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(worker_loop)
+    return worker_loop
+
+# Seconds the worker process init may spend on DB setup (below Celery's 4s limit)
+WORKER_INIT_DB_TIMEOUT = 2
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
     """
-    Perform bulk upsert for a chunk of data.
-    PostgreSQL ON CONFLICT is used to handle duplicates (Update on Duplicate).
+    Create the worker loop and ensure the schema exists before the first task.
+    This also opens the first pooled DB connection.
     """
-    insert_stmt = insert(Product).values(chunk_data)
-    
-    # Update existing record if SKU matches
-    do_update_stmt = insert_stmt.on_conflict_do_update(
-        index_elements=['sku'],
-        set_={
-            'name': insert_stmt.excluded.name,
-            'description': insert_stmt.excluded.description,
-            # 'is_active': insert_stmt.excluded.is_active # Optional: if CSV contains status
-        }
+    loop = get_worker_loop()
+    try:
+        # Celery kills children that don't finish initializing within ~4s, so a
+        # slow DB must not stall this handler
+        loop.run_until_complete(
+            asyncio.wait_for(setup_db_context_if_needed(), timeout=WORKER_INIT_DB_TIMEOUT)
+        )
+    except Exception as e:
+        # Tasks retry the schema setup until it succeeds
+        logger.warning(f"DB setup at worker start failed: {e!r}")
+
+# Rows per CSV chunk / upsert batch (override with UPSERT_BATCH_SIZE)
+UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", 10000))
+
+# Staging table used as the COPY target. TEMP tables are session-local and
+# never WAL-logged, so the bulk load skips the per-row executor overhead.
+# Duplicate SKUs within a batch are collapsed in SQL with DISTINCT ON, keeping
+# the last row COPYed (highest ctid) to avoid ON CONFLICT double-update errors.
+STAGE_COLUMNS = ['sku', 'name', 'description', 'is_active']
+
+CREATE_STAGE_SQL = """
+    CREATE TEMP TABLE IF NOT EXISTS products_stage (
+        sku TEXT NOT NULL,
+        name TEXT,
+        description TEXT,
+        is_active BOOLEAN
     )
+"""
+
+# upsert: update existing SKUs, skipping no-op updates so unchanged rows
+#         don't produce new tuple versions
+# append: only insert new SKUs, existing rows are left untouched
+UPSERT_FROM_STAGE_SQL = """
+    INSERT INTO products (sku, name, description, is_active)
+    SELECT DISTINCT ON (sku) sku, name, description, is_active FROM products_stage
+    ORDER BY sku, ctid DESC
+    ON CONFLICT (sku) DO UPDATE
+    SET name = EXCLUDED.name,
+        description = EXCLUDED.description
+    WHERE (products.name, products.description)
+        IS DISTINCT FROM (EXCLUDED.name, EXCLUDED.description)
+"""
+
+APPEND_FROM_STAGE_SQL = """
+    INSERT INTO products (sku, name, description, is_active)
+    SELECT DISTINCT ON (sku) sku, name, description, is_active FROM products_stage
+    ORDER BY sku, ctid DESC
+    ON CONFLICT (sku) DO NOTHING
+"""
+
+MERGE_SQL_BY_MODE = {
+    "upsert": UPSERT_FROM_STAGE_SQL,
+    "append": APPEND_FROM_STAGE_SQL,
+}
+
+TRUNCATE_STAGE_SQL = "TRUNCATE products_stage"
+
+async def get_asyncpg_connection(conn):
+    """Return the raw asyncpg connection behind a SQLAlchemy AsyncConnection."""
+    raw_conn = await conn.get_raw_connection()
+    return raw_conn.driver_connection
+
+async def prepare_stage(pg_conn, mode="upsert"):
+    """
+    Create the staging table and prepare the per-batch statements once.
+    The returned prepared statements are reused for every batch of the import,
+    so PostgreSQL parses and plans them a single time per task.
+    mode selects the merge statement (see MERGE_SQL_BY_MODE).
+    """
+    await pg_conn.execute(CREATE_STAGE_SQL)
+    upsert_stmt = await pg_conn.prepare(MERGE_SQL_BY_MODE[mode])
+    truncate_stmt = await pg_conn.prepare(TRUNCATE_STAGE_SQL)
+    return upsert_stmt, truncate_stmt
+
+async def process_chunk(pg_conn, chunk_data, upsert_stmt, truncate_stmt):
+    """
+    Perform bulk upsert for a chunk of data.
+    Rows (tuples ordered as STAGE_COLUMNS) are COPYed into a temp staging table,
+    then merged with INSERT ... SELECT ... ON CONFLICT (Update on Duplicate).
+    Each chunk is committed in its own transaction.
+    """
+    if not chunk_data:
+        return
+
+    try:
+        async with pg_conn.transaction():
+            await pg_conn.copy_records_to_table(
+                'products_stage', records=chunk_data, columns=STAGE_COLUMNS
+            )
+            await upsert_stmt.fetch()
+            await truncate_stmt.fetch()
+    except asyncpg.PostgresError:
+        logger.exception("Staging merge failed; row example: %s", chunk_data[:1])
+        raise
+
+# Minimum seconds between PROGRESS writes to the result backend
+PROGRESS_UPDATE_INTERVAL = 0.5
+
+# Bytes of CSV parsed per Arrow block (parsing is multithreaded within a block)
+CSV_BLOCK_SIZE = 8 << 20
+
+# Columns read from the CSV, in STAGE_COLUMNS order (is_active is always True)
+CSV_COLUMNS = ['sku', 'name', 'description']
+REQUIRED_COLUMNS = {'sku'}
+
+# Compressed uploads are decompressed on the fly while streaming
+COMPRESSION_BY_SUFFIX = {'.gz': 'gzip', '.zst': 'zstd'}
+
+def csv_compression(file_path):
+    """Return the Arrow codec name for a CSV path, or None if uncompressed."""
+    return COMPRESSION_BY_SUFFIX.get(os.path.splitext(file_path)[1])
+
+def read_csv_header(file_path):
+    """Return the raw header row of a (possibly compressed) CSV file."""
+    stream = pa.input_stream(file_path, compression=csv_compression(file_path))
+    with io.TextIOWrapper(stream, newline='', encoding='utf-8-sig') as f:
+        return next(csv.reader(f), [])
+
+def iter_csv_batches(file_path, chunk_size, block_size=CSV_BLOCK_SIZE):
+    """
+    Stream a CSV with pyarrow's multithreaded parser and yield
+    (RecordBatch, bytes_read) pairs of at most chunk_size rows each.
+    Headers are normalized once up front: only CSV_COLUMNS are converted, all
+    as strings (so type inference can't break on later blocks), and missing
+    optional columns come back as nulls. Quoted values may contain newlines;
+    rows with the wrong number of fields are skipped and logged.
+    bytes_read is the (compressed) file offset after the current block,
+    used for progress.
+    """
+    header = [c.lower() for c in read_csv_header(file_path)]
+    missing_columns = REQUIRED_COLUMNS - set(header)
+    if missing_columns:
+        raise ValueError(f"Missing required columns in CSV: {missing_columns}")
+
+    skipped_rows = 0
+
+    def skip_invalid_row(row):
+        # A short/long row shouldn't abort the whole import
+        nonlocal skipped_rows
+        skipped_rows += 1
+        logger.debug(f"Skipping CSV row {row.number}: expected {row.expected_columns} fields, got {row.actual_columns}")
+        return 'skip'
+
+    compression = csv_compression(file_path)
+    with pa.OSFile(file_path) as source:
+        stream = pa.CompressedInputStream(source, compression) if compression else source
+        reader = pacsv.open_csv(
+            stream,
+            read_options=pacsv.ReadOptions(
+                block_size=block_size, column_names=header, skip_rows=1
+            ),
+            parse_options=pacsv.ParseOptions(
+                newlines_in_values=True, invalid_row_handler=skip_invalid_row
+            ),
+            convert_options=pacsv.ConvertOptions(
+                include_columns=CSV_COLUMNS,
+                include_missing_columns=True,
+                column_types={c: pa.string() for c in CSV_COLUMNS},
+                strings_can_be_null=True,
+            ),
+        )
+        for batch in reader:
+            bytes_read = source.tell()
+            for offset in range(0, batch.num_rows, chunk_size):
+                yield batch.slice(offset, chunk_size), bytes_read
+
+    if skipped_rows:
+        logger.warning(f"Skipped {skipped_rows} malformed rows in {file_path}")
+
+def prepare_records(batch):
+    """Normalize a CSV batch into row tuples ordered as STAGE_COLUMNS."""
+    # Rows without a SKU can't be upserted
+    batch = batch.filter(pc.is_valid(batch.column('sku')))
+
+    # Vectorized Arrow transforms; rows are only materialized as plain tuples
+    # Ensure SKU is lowercase for case-insensitive matching logic
+    sku = pc.utf8_lower(pc.utf8_trim_whitespace(batch.column('sku')))
+    name = pc.fill_null(batch.column('name'), 'Unknown')
+    description = pc.fill_null(batch.column('description'), '')
+    return list(zip(
+        sku.to_pylist(),
+        name.to_pylist(),
+        description.to_pylist(),
+        repeat(True, batch.num_rows), # Default as per spec
+    ))
+
+async def run_import(task, file_path, chunk_size, total_bytes, mode="upsert"):
+    """
+    Import a CSV in one coroutine, overlapping parse and DB writes.
+    A producer thread parses/normalizes chunks into a small bounded queue while
+    this coroutine upserts them over a single connection. Returns rows processed.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=2)
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for batch, bytes_read in iter_csv_batches(file_path, chunk_size):
+                if stop.is_set():
+                    return
+                records = prepare_records(batch)
+                asyncio.run_coroutine_threadsafe(queue.put((records, bytes_read)), loop).result()
+        finally:
+            # Sentinel: tells the consumer the producer is done (or failed)
+            asyncio.run_coroutine_threadsafe(queue.put(None), loop).result()
+
+    producer = loop.run_in_executor(None, produce)
+    processed_count = 0
+    last_progress_push = 0.0
+
     try:
-        await session.execute(do_update_stmt)
-        await session.commit()
-    except (IntegrityError, DBAPIError) as err:
-        # Print the exact PostgreSQL error
-        print("DB-API error:", err.orig)        # ← real reason
-        print("SQLAlchemy stmt:", err.statement)
-        print("Params example:", err.params[:1])  # show one row
-        await session.rollback()
+        # One dedicated connection for the whole import: the temp staging table
+        # and prepared statements live on it. SQLAlchemy only manages checkout.
+        async with engine.connect() as conn:
+            pg_conn = await get_asyncpg_connection(conn)
+            upsert_stmt, truncate_stmt = await prepare_stage(pg_conn, mode)
+
+            while (item := await queue.get()) is not None:
+                records, bytes_read = item
+                await process_chunk(pg_conn, records, upsert_stmt, truncate_stmt)
+                processed_count += len(records)
+
+                # Update Progress (throttled; the final state is set on task success)
+                now = time.monotonic()
+                if now - last_progress_push >= PROGRESS_UPDATE_INTERVAL:
+                    last_progress_push = now
+                    task.update_state(state='PROGRESS', meta={
+                        'current': processed_count,
+                        'bytes_read': bytes_read,
+                        'total_bytes': total_bytes,
+                        'percent': min(100, int((bytes_read / total_bytes) * 100))
+                    })
+    except Exception:
+        # Unblock the producer so its thread can exit
+        stop.set()
+        while not queue.empty():
+            queue.get_nowait()
         raise
+    finally:
+        # Re-raises any parse error from the producer thread
+        await producer
+
+    return processed_count
 
 @celery_app.task(bind=True)
-def process_csv_upload(self, file_path):
+def process_csv_upload(self, file_path, mode="upsert"):
     """
     Reads a CSV file and imports it into the DB asynchronously.
+    mode is "upsert" (update existing SKUs) or "append" (skip existing SKUs).
     Updates task state for UI progress bar.
     """
     # Run async code in sync Celery task
-    loop = asyncio.get_event_loop()
+    loop = get_worker_loop()
     
     try:
-        # 1. Read CSV efficiently using Pandas
+        if mode not in MERGE_SQL_BY_MODE:
+            raise ValueError(f"Unknown import mode: {mode}")
+
+        # 1. Read CSV efficiently using pyarrow
         # We read in chunks to avoid loading 500k rows into RAM at once
-        chunk_size = 1000 
-        total_rows = sum(1 for _ in open(file_path)) - 1 # Rough count (minus header)
-        
-        self.update_state(state='STARTED', meta={'current': 0, 'total': total_rows})
-        
-        processed_count = 0
+        chunk_size = UPSERT_BATCH_SIZE
+        # Progress is tracked in bytes so we don't scan the file just to count rows
+        total_bytes = os.path.getsize(file_path) or 1
+
+        self.update_state(state='STARTED', meta={'current': 0, 'bytes_read': 0, 'total_bytes': total_bytes})
 
         logger.info(f"Processing CSV in chunks of {chunk_size} rows")
         
-        # Use pandas to iterate
-        with pd.read_csv(file_path, chunksize=chunk_size) as reader:
-            loop.run_until_complete(setup_db_context_if_needed())
-            
-            for chunk in reader:
-                # Normalize data
-                chunk.columns = [c.lower() for c in chunk.columns]
+        loop.run_until_complete(setup_db_context_if_needed())
+
+        processed_count = loop.run_until_complete(
+            run_import(self, file_path, chunk_size, total_bytes, mode)
+        )
 
-                # Drop duplicate SKUs within the chunk to avoid ON CONFLICT double-update error
-                chunk = chunk.drop_duplicates(subset=["sku"], keep="last")
-            
-                # Check for required columns
-                required_columns = {'sku'}
-                missing_columns = required_columns - set(chunk.columns)
-                if missing_columns:
-                    raise ValueError(f"Missing required columns in CSV: {missing_columns}")
-                # Transform to list of dicts for SQLAlchemy
-                # Ensure SKU is lowercase for case-insensitive matching logic
-                records = []
-                for _, row in chunk.iterrows():
-                    records.append({
-                        "sku": str(row['sku']).lower().strip(),
-                        "name": row.get('name', 'Unknown'),
-                        "description": row.get('description', ''),
-                        "is_active": True # Default as per spec
-                    })
-                
-                # Async DB Write
-                async def write_batch():
-                    async with AsyncSessionLocal() as session:
-                        await process_chunk(session, records)
-                
-                loop.run_until_complete(write_batch())
-                
-                processed_count += len(records)
-                
-                # Update Progress
-                self.update_state(state='PROGRESS', meta={
-                    'current': processed_count,
-                    'total': total_rows,
-                    'percent': int((processed_count / total_rows) * 100)
-                })
-
-        # Clean up file
-        os.remove(file_path)
-        
         # Trigger webhook for import completion
         webhook_payload = {
             "event": "import_completed",
             "import_stats": {
-                "total_rows": total_rows,
-                "processed_rows": total_rows,
+                "total_rows": processed_count,
+                "processed_rows": processed_count,
                 "status": "completed"
             }
         }
         loop.run_until_complete(trigger_webhooks("import_completed", webhook_payload))
         
-        return {'current': total_rows, 'total': total_rows, 'status': 'Import Complete'}
+        return {'current': processed_count, 'total': processed_count, 'status': 'Import Complete'}
 
     except Exception as e:
         # self.update_state(state='FAILURE', meta={'error': str(e)})
         raise e
+    finally:
+        # Clean up file whether or not the import succeeded
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
 
 @celery_app.task
 def delete_all_products_task():
-    loop = asyncio.get_event_loop()
+    loop = get_worker_loop()
     
     async def run_delete():
         async with AsyncSessionLocal() as session:
@@ -159,70 +392,120 @@ def delete_all_products_task():
     loop.run_until_complete(run_delete())
     return "Deleted All"
 
+# Set once create_all has succeeded in this process
+_SCHEMA_READY = False
+
 async def setup_db_context_if_needed():
     # Helper to ensure tables exist if worker starts before web (race condition handling)
+    global _SCHEMA_READY
+    if _SCHEMA_READY:
+        return
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    _SCHEMA_READY = True
+
+async def send_webhook(client, webhook_url, payload, event_type):
+    """Post a webhook payload over a shared client, raising on failure."""
+    headers = {
+        'Content-Type': 'application/json',
+        'X-Webhook-Event': event_type,
+        'X-Webhook-Timestamp': datetime.utcnow().isoformat()
+    }
 
-@celery_app.task(bind=True, max_retries=3)
-def deliver_webhook(self, webhook_url, payload, event_type):
+    try:
+        response = await client.post(webhook_url, json=payload, headers=headers)
+        response.raise_for_status()
+        logger.info(f"Webhook delivered successfully to {webhook_url}")
+        return True
+
+    except httpx.TimeoutException:
+        logger.warning(f"Webhook timeout for {webhook_url}")
+        raise
+    except httpx.RequestError as e:
+        logger.error(f"Webhook delivery failed to {webhook_url}: {e}")
+        raise
+    except httpx.HTTPStatusError as e:
+        logger.error(f"Webhook HTTP error {e.response.status_code} for {webhook_url}")
+        raise
+
+# Fire-and-forget: nothing reads the result, so skip the result backend write
+@celery_app.task(bind=True, ignore_result=True, max_retries=3)
+def deliver_webhooks(self, webhook_urls, payload, event_type):
     """
-    Deliver webhook payload to specified URL with retry logic.
-    Runs asynchronously to avoid blocking main application.
+    Deliver webhook payload to all specified URLs with retry logic.
+    One HTTP/2 client is shared so connections are reused across endpoints;
+    only the URLs that failed are retried.
     """
-    loop = asyncio.get_event_loop()
-    
-    async def send_webhook():
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            headers = {
-                'Content-Type': 'application/json',
-                'X-Webhook-Event': event_type,
-                'X-Webhook-Timestamp': datetime.utcnow().isoformat()
-            }
-            
-            try:
-                response = await client.post(webhook_url, json=payload, headers=headers)
-                response.raise_for_status()
-                logger.info(f"Webhook delivered successfully to {webhook_url}")
-                return True
-                
-            except httpx.TimeoutException:
-                logger.warning(f"Webhook timeout for {webhook_url}")
-                raise
-            except httpx.RequestError as e:
-                logger.error(f"Webhook delivery failed to {webhook_url}: {e}")
-                raise
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Webhook HTTP error {e.response.status_code} for {webhook_url}")
-                raise
-    
-    try:
-        return loop.run_until_complete(send_webhook())
-        
-    except Exception as exc:
-        # Retry with exponential backoff
-        if self.request.retries < self.max_retries:
-            countdown = 2 ** self.request.retries
-            logger.info(f"Retrying webhook delivery in {countdown}s (attempt {self.request.retries + 1})")
-            raise self.retry(countdown=countdown, exc=exc)
-        else:
-            logger.error(f"Webhook delivery failed after {self.max_retries} attempts: {exc}")
-            return False
+    loop = get_worker_loop()
+
+    async def send_all():
+        limits = httpx.Limits(max_keepalive_connections=50)
+        async with httpx.AsyncClient(timeout=10.0, http2=True, limits=limits) as client:
+            return await asyncio.gather(
+                *[send_webhook(client, url, payload, event_type) for url in webhook_urls],
+                return_exceptions=True,
+            )
+
+    results = loop.run_until_complete(send_all())
+    failed = [url for url, result in zip(webhook_urls, results) if isinstance(result, Exception)]
+    if not failed:
+        return True
+
+    # Retry failed URLs with exponential backoff
+    if self.request.retries < self.max_retries:
+        countdown = 2 ** self.request.retries
+        logger.info(f"Retrying {len(failed)} webhook deliveries in {countdown}s (attempt {self.request.retries + 1})")
+        raise self.retry(args=(failed, payload, event_type), countdown=countdown)
+    else:
+        logger.error(f"Webhook delivery failed after {self.max_retries} attempts for: {failed}")
+        return False
+
+def webhook_cache_key(event_type):
+    return f"webhooks:{event_type}"
 
 async def get_active_webhooks(event_type, session):
-    """Get all active webhooks for a specific event type."""
+    """
+    Get the URLs of all active webhooks for a specific event type.
+    Results are cached in Redis; webhook CRUD endpoints invalidate the cache
+    and WEBHOOK_CACHE_TTL bounds staleness otherwise.
+    """
+    key = webhook_cache_key(event_type)
+    if redis_client is not None:
+        try:
+            cached = await redis_client.get(key)
+            if cached is not None:
+                return orjson.loads(cached)
+        except RedisError as e:
+            logger.warning(f"Webhook cache read failed: {e}")
+
     result = await session.execute(
-        select(Webhook).where(Webhook.event_type == event_type, Webhook.is_active == True)
+        select(Webhook.url).where(Webhook.event_type == event_type, Webhook.is_active == True)
     )
-    return result.scalars().all()
+    urls = result.scalars().all()
+
+    if redis_client is not None:
+        try:
+            await redis_client.set(key, orjson.dumps(urls), ex=WEBHOOK_CACHE_TTL)
+        except RedisError as e:
+            logger.warning(f"Webhook cache write failed: {e}")
+    return urls
+
+async def invalidate_webhook_cache(*event_types):
+    """Drop cached webhook lookups for the given event types."""
+    if redis_client is None or not event_types:
+        return
+    try:
+        await redis_client.delete(*{webhook_cache_key(e) for e in event_types})
+    except RedisError as e:
+        logger.warning(f"Webhook cache invalidation failed: {e}")
 
 async def trigger_webhooks(event_type, payload):
     """Trigger all active webhooks for a given event type."""
     async with AsyncSessionLocal() as session:
-        webhooks = await get_active_webhooks(event_type, session)
+        webhook_urls = await get_active_webhooks(event_type, session)
         
-        # Queue webhook delivery tasks
-        for webhook in webhooks:
-            deliver_webhook.delay(webhook.url, payload, event_type)
+        # Queue a single delivery task for all endpoints
+        if webhook_urls:
+            deliver_webhooks.delay(webhook_urls, payload, event_type)
             
-        logger.info(f"Queued {len(webhooks)} webhooks for event: {event_type}")
\ No newline at end of file
+        logger.info(f"Queued {len(webhook_urls)} webhooks for event: {event_type}")
\ No newline at end of file